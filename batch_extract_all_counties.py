@@ -3,117 +3,286 @@
 Batch extract VFC providers for all California counties.
 Automatically creates JSON_Counties folder and saves one JSON file per county.
 """
+import asyncio
+import gzip
 import os
-import json
 import sys
+import time
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+import aiohttp
+import orjson
 
 # Import functions from vfc_cli
 from vfc_cli import (
+    BASE_URL,
+    CACHE_TTL,
     CALIFORNIA_COUNTIES,
-    extract_county_providers,
-    fetch_providers
+    USER_AGENT,
+    apply_county_filter,
+    clear_cache,
+    follow_up_locations,
+    get_county_search_locations,
+    load_cached_xml,
+    parse_providers_xml,
+    save_cached_xml
 )
 
+# Concurrency limits: enough parallelism to hide latency without tripping
+# the server's rate limiting
+MAX_CONCURRENT_COUNTIES = 16
+MAX_CONNECTIONS_PER_HOST = 16
+# Keep idle connections longer than aiohttp's 15s default (and cache the DNS
+# answer), so lulls like saving a finished county don't force new TLS handshakes
+KEEPALIVE_TIMEOUT = 60
+DNS_CACHE_TTL = 300
+MAX_RETRIES = 4
+RETRY_STATUSES = {429, 503}
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
 def create_output_folder(folder_name: str = "JSON_Counties") -> Path:
     """Create the output folder if it doesn't exist."""
     folder_path = Path(folder_name)
     folder_path.mkdir(exist_ok=True)
     return folder_path
 
-def save_county_json(providers: List[Dict], county_name: str, output_folder: Path):
-    """Save providers to a JSON file in the output folder."""
+def save_county_json(providers: List[Dict], county_name: str, output_folder: Path,
+                     compress: bool = False):
+    """Save providers as compact JSON (gzipped to .json.gz if compress) in the output folder."""
     # Sanitize filename
     filename = county_name.replace(' ', '_').lower() + '.json'
     filepath = output_folder / filename
+    data = orjson.dumps(providers, option=orjson.OPT_NON_STR_KEYS)
     
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(providers, f, indent=2, ensure_ascii=False)
+    if compress:
+        filepath = filepath.with_suffix('.json.gz')
+        with gzip.open(filepath, 'wb', compresslevel=1) as f:
+            f.write(data)
+    else:
+        filepath.write_bytes(data)
     
     return filepath
 
-def extract_all_counties(radius: int = 200, output_folder: str = "JSON_Counties"):
-    """Extract providers for all California counties and save to JSON files."""
+async def fetch_providers_async(session: aiohttp.ClientSession, lat: float, lng: float,
+                                radius: int = 500) -> List[Dict]:
+    """Fetch providers for a given location and radius, backing off on 429/503.
+    
+    Raises if the request still fails, so the county isn't recorded as done.
+    """
+    params = {
+        'lat': lat,
+        'lng': lng,
+        'radius': radius
+    }
+    
+    try:
+        body = load_cached_xml(lat, lng, radius)
+        attempt = 0
+        while body is None:
+            async with session.get(BASE_URL, params=params) as response:
+                retry = response.status in RETRY_STATUSES and attempt < MAX_RETRIES - 1
+                if retry:
+                    # Drain the short error body so the connection goes back to the pool
+                    await response.read()
+                else:
+                    response.raise_for_status()
+                    body = await response.read()
+            if retry:
+                # Back off after the response is released, so the wait holds no connection
+                await asyncio.sleep(2 ** attempt)
+                attempt += 1
+                continue
+            save_cached_xml(lat, lng, radius, body)
+        
+        # Parsing is CPU work; run it off the event loop so other fetches keep flowing
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, parse_providers_xml, body)
+    except Exception as e:
+        print(f"Error fetching providers for {lat},{lng}: {e!r}", file=sys.stderr)
+        raise
+
+async def extract_county_providers_async(session: aiohttp.ClientSession, county_name: str,
+                                         radius: int = 100) -> List[Dict]:
+    """Extract providers for a county by querying all of its search locations concurrently."""
+    search_locations = get_county_search_locations(county_name, radius)
+    
+    # Search the center first; its result count decides how much of the
+    # grid is still needed
+    center_lat, center_lng = search_locations[0]
+    center_providers = await fetch_providers_async(session, center_lat, center_lng, radius=radius)
+    remaining = follow_up_locations(search_locations, len(center_providers))
+    results = [center_providers] + await asyncio.gather(*[
+        fetch_providers_async(session, lat, lng, radius=radius)
+        for lat, lng in remaining
+    ], return_exceptions=True)
+    
+    # A failed location leaves the county incomplete; fail it so the next run retries it
+    for providers in results:
+        if isinstance(providers, Exception):
+            raise providers
+    
+    # Use name+address as unique key to avoid duplicates
+    all_providers = {}
+    for providers in results:
+        for provider in providers:
+            all_providers.setdefault((provider['name'], provider['address']), provider)
+    
+    providers_list = list(all_providers.values())
+    if not providers_list:
+        return []
+    
+    print(f"{county_name}: {len(providers_list)} unique providers "
+          f"from {len(results)} locations", end='')
+    return apply_county_filter(providers_list, county_name)
+
+def load_progress(progress_file: Path, radius: int) -> Dict[str, Dict]:
+    """Load per-county results already recorded for this radius by an earlier run."""
+    completed = {}
+    if progress_file.exists():
+        for line in progress_file.read_bytes().splitlines():
+            try:
+                result = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue  # Partial line from an interrupted write
+            if result.get('search_radius') == radius:
+                completed[result['county']] = result
+    return completed
+
+async def extract_counties_async(counties: List[str], radius: int, handle_result):
+    """Extract every county concurrently, handing providers (or the error) to
+    handle_result(county_name, providers) as each county finishes."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_COUNTIES)
+    connector = aiohttp.TCPConnector(limit_per_host=MAX_CONNECTIONS_PER_HOST,
+                                     keepalive_timeout=KEEPALIVE_TIMEOUT,
+                                     ttl_dns_cache=DNS_CACHE_TTL)
+    
+    # aiohttp adds Accept-Encoding itself, including br when Brotli is installed
+    async with aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT,
+                                     headers={'User-Agent': USER_AGENT}) as session:
+        async def sem_bounded(county_name: str):
+            async with semaphore:
+                try:
+                    return county_name, await extract_county_providers_async(session, county_name, radius=radius)
+                except Exception as e:
+                    return county_name, e
+        
+        for task in asyncio.as_completed([sem_bounded(c) for c in counties]):
+            handle_result(*await task)
+
+def extract_all_counties(radius: int = 200, output_folder: str = "JSON_Counties",
+                         compress: bool = False, counties: Optional[List[str]] = None):
+    """Extract providers for all California counties (or just the given ones) and
+    save to JSON files.
+    
+    Each finished county is appended to _progress.jsonl in the output folder, so an
+    interrupted or partly failed run picks up where it left off; _summary.json is
+    built from that log. A log older than the response cache is discarded.
+    """
+    
+    # Get sorted list of counties
+    counties = sorted(counties or CALIFORNIA_COUNTIES.keys())
     
     print("=" * 80)
     print("VFC Provider Batch Extractor - All California Counties")
     print("=" * 80)
     print(f"\nOutput folder: {output_folder}")
     print(f"Search radius: {radius} miles")
-    print(f"Total counties: {len(CALIFORNIA_COUNTIES)}")
+    print(f"Total counties: {len(counties)}")
     print("\nStarting extraction...\n")
     
     # Create output folder
     output_path = create_output_folder(output_folder)
     print(f"✓ Created/verified output folder: {output_path.absolute()}\n")
     
-    # Get sorted list of counties
-    counties = sorted(CALIFORNIA_COUNTIES.keys())
+    # Skip counties already finished by an interrupted run
+    progress_file = output_path / "_progress.jsonl"
+    if progress_file.exists() and time.time() - progress_file.stat().st_mtime > CACHE_TTL:
+        # Those results are as stale as an expired cache entry; start over
+        print("Discarding progress from a run more than a day old\n")
+        progress_file.unlink()
+    completed = load_progress(progress_file, radius)
+    pending = [c for c in counties if c not in completed]
+    if completed:
+        print(f"Resuming: {len(completed)} counties already extracted, {len(pending)} remaining\n")
     
-    # Statistics
-    total_providers = 0
-    successful_counties = 0
-    failed_counties = []
-    results_summary = []
+    errored_counties = []
     
-    # Process each county
-    for i, county_name in enumerate(counties, 1):
-        print(f"[{i}/{len(counties)}] Processing {county_name} County...")
-        print("-" * 80)
+    with open(progress_file, 'ab') as progress:
+        def record(county_name: str, providers: List[Dict], filepath: Path, types: Dict):
+            result = {
+                'county': county_name,
+                'providers': len(providers),
+                'types': types,
+                'file': filepath.name,
+                'search_radius': radius
+            }
+            progress.write(orjson.dumps(result) + b"\n")
+            progress.flush()
         
-        try:
-            # Extract providers for this county
-            providers = extract_county_providers(county_name, radius=radius)
+        def handle_result(county_name: str, providers):
+            done = len(counties) - len(pending) + 1
+            pending.remove(county_name)
+            print(f"[{done}/{len(counties)}] {county_name} County")
+            print("-" * 80)
             
-            if providers:
-                # Save to JSON
-                filepath = save_county_json(providers, county_name, output_path)
-                
-                # Count by type
-                types = {}
-                for provider in providers:
-                    ptype = provider.get('type', 'Unknown')
-                    types[ptype] = types.get(ptype, 0) + 1
-                
-                print(f"✓ Saved {len(providers)} providers to {filepath.name}")
-                print(f"  Provider types: {dict(types)}")
+            try:
+                if isinstance(providers, Exception):
+                    raise providers
                 
-                total_providers += len(providers)
-                successful_counties += 1
-                results_summary.append({
-                    'county': county_name,
-                    'providers': len(providers),
-                    'types': types,
-                    'file': filepath.name
-                })
-            else:
-                print(f"⚠ No providers found for {county_name} County")
-                # Still create an empty JSON file
-                filepath = save_county_json([], county_name, output_path)
-                results_summary.append({
-                    'county': county_name,
-                    'providers': 0,
-                    'types': {},
-                    'file': filepath.name
-                })
-                failed_counties.append(county_name)
+                if providers:
+                    # Save to JSON
+                    filepath = save_county_json(providers, county_name, output_path, compress)
+                    
+                    # Count by type
+                    types = dict(Counter(p.get('type', 'Unknown') for p in providers))
+                    
+                    print(f"✓ Saved {len(providers)} providers to {filepath.name}")
+                    print(f"  Provider types: {dict(types)}")
+                    record(county_name, providers, filepath, types)
+                else:
+                    print(f"⚠ No providers found for {county_name} County")
+                    # Still create an empty JSON file
+                    filepath = save_county_json([], county_name, output_path, compress)
+                    record(county_name, [], filepath, {})
+            
+            except Exception as e:
+                print(f"✗ Error processing {county_name}: {e}")
+                errored_counties.append(county_name)
+                # Create empty JSON file for failed county
+                try:
+                    filepath = save_county_json([], county_name, output_path, compress)
+                except:
+                    pass
+            
+            print()  # Blank line between counties
         
+        # Fetch all remaining counties concurrently
+        try:
+            asyncio.run(extract_counties_async(list(pending), radius, handle_result))
         except KeyboardInterrupt:
             print("\n\n⚠ Extraction interrupted by user")
-            print(f"Completed {i-1}/{len(counties)} counties")
+            print(f"Completed {len(counties) - len(pending)}/{len(counties)} counties "
+                  f"(progress saved to {progress_file.name})")
             sys.exit(1)
-        
-        except Exception as e:
-            print(f"✗ Error processing {county_name}: {e}")
-            failed_counties.append(county_name)
-            # Create empty JSON file for failed county
-            try:
-                filepath = save_county_json([], county_name, output_path)
-            except:
-                pass
-        
-        print()  # Blank line between counties
+    
+    # Build the summary from the progress log
+    completed = load_progress(progress_file, radius)
+    results_summary = []
+    for county_name in counties:
+        if county_name in completed:
+            result = completed[county_name]
+            del result['search_radius']
+            results_summary.append(result)
+    
+    total_providers = sum(r['providers'] for r in results_summary)
+    successful_counties = sum(1 for r in results_summary if r['providers'] > 0)
+    failed_counties = [c for c in counties if completed.get(c, {}).get('providers', 0) == 0]
+    
+    # Keep the log around only if some counties still need retrying
+    if not errored_counties:
+        progress_file.unlink()
     
     # Print summary
     print("=" * 80)
@@ -133,15 +302,14 @@ def extract_all_counties(radius: int = 200, output_folder: str = "JSON_Counties"
     
     # Save summary JSON
     summary_file = output_path / "_summary.json"
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            'total_counties': len(counties),
-            'successful_counties': successful_counties,
-            'failed_counties': len(failed_counties),
-            'total_providers': total_providers,
-            'search_radius': radius,
-            'results': results_summary
-        }, f, indent=2, ensure_ascii=False)
+    summary_file.write_bytes(orjson.dumps({
+        'total_counties': len(counties),
+        'successful_counties': successful_counties,
+        'failed_counties': len(failed_counties),
+        'total_providers': total_providers,
+        'search_radius': radius,
+        'results': results_summary
+    }, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     
     print(f"\n✓ Summary saved to {summary_file.name}")
     
@@ -166,6 +334,8 @@ Examples:
   python batch_extract_all_counties.py
   python batch_extract_all_counties.py --radius 300
   python batch_extract_all_counties.py --radius 200 --output my_counties
+  python batch_extract_all_counties.py --gzip
+  python batch_extract_all_counties.py --clear-cache
         """
     )
     
@@ -183,6 +353,18 @@ Examples:
         help='Output folder name (default: JSON_Counties)'
     )
     
+    parser.add_argument(
+        '--gzip',
+        action='store_true',
+        help='Write county files as gzip-compressed .json.gz'
+    )
+    
+    parser.add_argument(
+        '--clear-cache',
+        action='store_true',
+        help='Discard cached API responses before starting'
+    )
+    
     args = parser.parse_args()
     
     # Confirm before starting
@@ -200,8 +382,12 @@ Examples:
         print("\nCancelled.")
         return
     
+    if args.clear_cache:
+        clear_cache()
+        print("✓ Cleared cached API responses")
+    
     # Run extraction
-    extract_all_counties(radius=args.radius, output_folder=args.output)
+    extract_all_counties(radius=args.radius, output_folder=args.output, compress=args.gzip)
 
 if __name__ == "__main__":
     main()
@@ -2,9 +2,30 @@ import requests
 import re
 import json
 import time
+import orjson
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, parse_qs, urlparse
 
+# Patterns compiled once and shared by every scrape
+# Any string literal passed to url:, fetch(), ajax(), get() or post()
+API_PATTERN = re.compile(
+    r'(?:url\s*:|(?:fetch|ajax|get|post)\s*\()\s*[\'"]([^\'"]+)[\'"]',
+    re.IGNORECASE
+)
+
+# Array literals assigned with var/const/let, and with a plain "=". Both scans
+# are needed: the bare form can start at an earlier "=" (e.g. inside "a == [1]")
+# and swallow a following declaration, losing the real array
+JSON_DECL_PATTERN = re.compile(r'\b(?:var|const|let)\s+\w+\s*=\s*(\[.*?\]);', re.DOTALL)
+JSON_ASSIGN_PATTERN = re.compile(r'=\s*(\[.*?\]);', re.DOTALL)
+
+# Keywords that mark a script as worth showing while analyzing the page
+SCRIPT_KEYWORDS = ('provider', 'search', 'api', 'ajax', 'fetch')
+
+PROVIDER_CLASS_PATTERN = re.compile(r'provider|location|clinic', re.I)
+ADDRESS_PATTERN = re.compile(r'\d+.*\w+.*,.*\w+')
+PHONE_PATTERN = re.compile(r'\(\d{3}\)\s*\d{3}-\d{4}')
+
 class VFCProviderScraper:
     def __init__(self):
         self.session = requests.Session()
@@ -29,7 +50,7 @@ class VFCProviderScraper:
             print(f"Failed to fetch page: {response.status_code}")
             return None
             
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml')
         return soup
 
     def find_search_form(self, soup):
@@ -52,29 +73,24 @@ class VFCProviderScraper:
         # Look for JavaScript that might handle provider search
         scripts = soup.find_all('script')
         for script in scripts:
-            if script.string and any(keyword in script.string.lower() for keyword in ['provider', 'search', 'api', 'ajax', 'fetch']):
+            body = (script.string or '').lower()
+            if any(keyword in body for keyword in SCRIPT_KEYWORDS):
                 print(f"\n=== Relevant JavaScript found ===")
                 print(script.string[:500] + "..." if len(script.string) > 500 else script.string)
 
     def search_for_api_endpoints(self, soup):
         """Look for AJAX endpoints or API calls in the JavaScript"""
         scripts = soup.find_all('script')
-        api_patterns = [
-            r'url\s*:\s*[\'"]([^\'"]+)[\'"]',
-            r'fetch\s*\(\s*[\'"]([^\'"]+)[\'"]',
-            r'ajax\s*\(\s*[\'"]([^\'"]+)[\'"]',
-            r'get\s*\(\s*[\'"]([^\'"]+)[\'"]',
-            r'post\s*\(\s*[\'"]([^\'"]+)[\'"]'
-        ]
         
         endpoints = set()
         for script in scripts:
-            if script.string:
-                for pattern in api_patterns:
-                    matches = re.findall(pattern, script.string, re.IGNORECASE)
-                    for match in matches:
-                        if 'provider' in match.lower() or 'search' in match.lower():
-                            endpoints.add(match)
+            # Only endpoints mentioning provider/search are kept, so skip
+            # scripts that can't contain one
+            body = (script.string or '').lower()
+            if 'provider' in body or 'search' in body:
+                for match in API_PATTERN.findall(script.string):
+                    if 'provider' in match.lower() or 'search' in match.lower():
+                        endpoints.add(match)
         
         return list(endpoints)
 
@@ -97,7 +113,7 @@ class VFCProviderScraper:
                 if response.status_code == 200:
                     print(f"✓ Found endpoint: {full_url}")
                     try:
-                        data = response.json()
+                        data = orjson.loads(response.content)
                         print(f"  JSON data with {len(data)} items" if isinstance(data, list) else f"  JSON object with {len(data)} keys" if isinstance(data, dict) else "  Valid JSON response")
                         return full_url, data
                     except:
@@ -145,20 +161,17 @@ class VFCProviderScraper:
         # Look for data in script tags
         scripts = soup.find_all('script')
         for script in scripts:
-            if script.string:
-                # Try to find JSON data
-                json_patterns = [
-                    r'var\s+\w+\s*=\s*(\[.*?\]);',
-                    r'const\s+\w+\s*=\s*(\[.*?\]);',
-                    r'let\s+\w+\s*=\s*(\[.*?\]);',
-                    r'=\s*(\[.*?\]);'
-                ]
-                
-                for pattern in json_patterns:
-                    matches = re.findall(pattern, script.string, re.DOTALL)
-                    for match in matches:
+            # Every candidate array ends in "];", so skip scripts without one
+            if script.string and '];' in script.string:
+                # Try to find JSON data, trying each captured array only once
+                seen_starts = set()
+                for pattern in (JSON_DECL_PATTERN, JSON_ASSIGN_PATTERN):
+                    for match in pattern.finditer(script.string):
+                        if match.start(1) in seen_starts:
+                            continue
+                        seen_starts.add(match.start(1))
                         try:
-                            data = json.loads(match)
+                            data = orjson.loads(match.group(1))
                             if isinstance(data, list) and len(data) > 0:
                                 print(f"Found JSON array with {len(data)} items")
                                 self.providers.extend(data)
@@ -167,7 +180,7 @@ class VFCProviderScraper:
         
         # Look for structured data in HTML
         provider_containers = soup.find_all(['div', 'section', 'article'], 
-                                          class_=re.compile(r'provider|location|clinic', re.I))
+                                          class_=PROVIDER_CLASS_PATTERN)
         
         for container in provider_containers:
             provider_info = {}
@@ -178,12 +191,12 @@ class VFCProviderScraper:
                 provider_info['name'] = name_elem.get_text(strip=True)
             
             # Try to extract address
-            address_elem = container.find(text=re.compile(r'\d+.*\w+.*,.*\w+'))
+            address_elem = container.find(text=ADDRESS_PATTERN)
             if address_elem:
                 provider_info['address'] = address_elem.strip()
             
             # Try to extract phone
-            phone_elem = container.find(text=re.compile(r'\(\d{3}\)\s*\d{3}-\d{4}'))
+            phone_elem = container.find(text=PHONE_PATTERN)
             if phone_elem:
                 provider_info['phone'] = phone_elem.strip()
             
@@ -1,11 +1,26 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
 import requests
-import xml.etree.ElementTree as ET
+from lxml import etree as ET
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
 import json
-from typing import Set, Dict, List
+from typing import Set, Dict, List, Tuple
 
 # The actual endpoint for provider data
 BASE_URL = "https://eziz.org/iframes/genxml.php"
 
+# Shared session so every query reuses the same keep-alive connection to eziz.org
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+))
+# Ask for compressed responses (br/zstd too when their packages are installed)
+_SESSION.headers.update(make_headers(accept_encoding=True))
+
 # California coordinates to cover the state
 # Using major cities/regions to ensure we get all providers
 CALIFORNIA_LOCATIONS = [
@@ -27,6 +42,18 @@ CALIFORNIA_LOCATIONS = [
     (33.6846, -117.8265),   # Orange County
 ]
 
+def _marker_to_provider(attrib) -> Dict:
+    """Build a provider dict from a marker's attributes."""
+    return {
+        'name': attrib.get('name', ''),
+        'address': attrib.get('address', ''),
+        'phone': attrib.get('phone', ''),
+        'type': attrib.get('type', ''),
+        'lat': float(attrib.get('lat', 0)),
+        'lng': float(attrib.get('lng', 0)),
+        'distance': float(attrib.get('distance', 0))
+    }
+
 def fetch_providers(lat: float, lng: float, radius: int = 500) -> List[Dict]:
     """Fetch providers for a given location and radius."""
     params = {
@@ -36,24 +63,17 @@ def fetch_providers(lat: float, lng: float, radius: int = 500) -> List[Dict]:
     }
     
     try:
-        response = requests.get(BASE_URL, params=params, timeout=10)
+        response = _SESSION.get(BASE_URL, params=params, timeout=10)
         response.raise_for_status()
         
-        # Parse XML
-        root = ET.fromstring(response.content)
+        # Parse XML incrementally, discarding each marker once it's read
         providers = []
         
-        for marker in root.findall('marker'):
-            provider = {
-                'name': marker.get('name', ''),
-                'address': marker.get('address', ''),
-                'phone': marker.get('phone', ''),
-                'type': marker.get('type', ''),
-                'lat': float(marker.get('lat', 0)),
-                'lng': float(marker.get('lng', 0)),
-                'distance': float(marker.get('distance', 0))
-            }
-            providers.append(provider)
+        for _, marker in ET.iterparse(io.BytesIO(response.content), tag='marker'):
+            providers.append(_marker_to_provider(marker.attrib))
+            marker.clear()
+            while marker.getprevious() is not None:
+                del marker.getparent()[0]
         
         return providers
     except Exception as e:
@@ -62,30 +82,32 @@ def fetch_providers(lat: float, lng: float, radius: int = 500) -> List[Dict]:
 
 def get_all_providers() -> List[Dict]:
     """Fetch all providers by querying multiple locations."""
-    all_providers = {}
-    
     # Use name+address as unique key to avoid duplicates
-    for lat, lng in CALIFORNIA_LOCATIONS:
-        print(f"Fetching providers near {lat}, {lng}...")
-        providers = fetch_providers(lat, lng, radius=500)
-        
+    seen: Set[Tuple[str, str]] = set()
+    all_providers: List[Dict] = []
+    
+    def merge(providers: List[Dict]):
         for provider in providers:
-            # Create unique key from name and address
-            key = f"{provider['name']}|{provider['address']}"
-            if key not in all_providers:
-                all_providers[key] = provider
-        
-        print(f"  Found {len(providers)} providers (total unique: {len(all_providers)})")
+            key = (provider['name'], provider['address'])
+            if key not in seen:
+                seen.add(key)
+                all_providers.append(provider)
     
     # Also try with a very large radius from the center of California
-    print("\nFetching with large radius from state center...")
-    center_providers = fetch_providers(36.7783, -119.4179, radius=1000)  # Center of CA
-    for provider in center_providers:
-        key = f"{provider['name']}|{provider['address']}"
-        if key not in all_providers:
-            all_providers[key] = provider
+    queries = [(lat, lng, 500) for lat, lng in CALIFORNIA_LOCATIONS]
+    queries.append((36.7783, -119.4179, 1000))  # Center of CA
+    
+    # Fetch all locations concurrently; results come back in query order
+    print(f"Fetching providers from {len(queries)} locations...")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda q: fetch_providers(q[0], q[1], radius=q[2]), queries))
+    
+    for (lat, lng, radius), providers in zip(queries, results):
+        merge(providers)
+        print(f"  Near {lat}, {lng} ({radius} mi): found {len(providers)} providers "
+              f"(total unique: {len(all_providers)})")
     
-    return list(all_providers.values())
+    return all_providers
 
 if __name__ == "__main__":
     print("Starting VFC provider scraping...")
@@ -4,15 +4,63 @@ CLI tool to extract VFC providers by California county
 """
 import requests
 import xml.etree.ElementTree as ET
+import functools
+import gzip
+import hashlib
+import io
 import json
+import os
 import sys
 import re
-from typing import List, Dict, Optional
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+try:
+    from lxml import etree as _lxml_etree
+except ImportError:
+    _lxml_etree = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Parse errors that send a response to the regex fallback
+_XML_ERRORS = (ET.ParseError,) if _lxml_etree is None else (ET.ParseError, _lxml_etree.XMLSyntaxError)
 
 # The actual endpoint for provider data
 BASE_URL = "https://eziz.org/iframes/genxml.php"
 
+USER_AGENT = "vfc-cli/1.0"
+
+# Grid locations for a county are fetched in parallel over one pooled session
+MAX_FETCH_WORKERS = 9
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=MAX_FETCH_WORKERS, pool_maxsize=MAX_FETCH_WORKERS))
+# Compressed responses, and a User-Agent the server can tell apart
+_SESSION.headers.update(make_headers(accept_encoding=True, user_agent=USER_AGENT))
+
+# The API returns at most ~50 providers per request; a center search well
+# under that has already found everything in range
+API_RESULT_LIMIT = 50
+SPARSE_RESULT_THRESHOLD = 40
+
+# County searches use a 3x3 grid of points this far apart (~3.5 miles)
+GRID_STEP_DEGREES = 0.05
+MILES_PER_DEGREE = 69
+
+# Raw API responses are cached on disk, keyed by query. Provider lists change
+# slowly, so entries stay fresh for a day
+CACHE_DIR = Path(".cache")
+CACHE_TTL = 24 * 60 * 60
+
 # California counties with their approximate coordinates (county seat or major city)
 CALIFORNIA_COUNTIES = {
     "Alameda": (37.8044, -122.2712),  # Oakland
@@ -75,81 +123,183 @@ CALIFORNIA_COUNTIES = {
     "Yuba": (39.1404, -121.6199),      # Marysville
 }
 
-def fetch_providers(lat: float, lng: float, radius: int = 500) -> List[Dict]:
-    """Fetch providers for a given location and radius."""
-    params = {
-        'lat': lat,
-        'lng': lng,
-        'radius': radius
+# Menu order, and lowercase names for partial matching
+_SORTED_COUNTIES: Tuple[str, ...] = tuple(sorted(CALIFORNIA_COUNTIES.keys()))
+_COUNTY_LOWER_INDEX: Tuple[str, ...] = tuple(c.lower() for c in _SORTED_COUNTIES)
+
+# Map county names to their primary city names that appear in addresses
+_COUNTY_TO_CITIES = {
+    "Alameda": ["Alameda", "Oakland", "Berkeley", "Fremont"],
+    "Contra Costa": ["Contra Costa", "Martinez", "Richmond", "Concord", "Pleasant Hill"],
+    "Fresno": ["Fresno", "Clovis", "Sanger"],
+    "Kern": ["Kern", "Bakersfield"],
+    "Los Angeles": ["Los Angeles", "LA", "L.A.", "Beverly Hills", "Long Beach", "Pasadena"],
+    "Orange": ["Orange", "Santa Ana", "Anaheim", "Irvine", "Huntington Beach"],
+    "Riverside": ["Riverside", "Palm Springs", "Moreno Valley", "Corona"],
+    "Sacramento": ["Sacramento", "Folsom", "Elk Grove"],
+    "San Bernardino": ["San Bernardino", "Fontana", "Rancho Cucamonga", "Ontario"],
+    "San Diego": ["San Diego", "Chula Vista", "Oceanside"],
+    "San Francisco": ["San Francisco", "SF"],
+    "San Joaquin": ["San Joaquin", "Stockton", "Lodi", "Tracy"],
+    "Santa Clara": ["Santa Clara", "San Jose", "Sunnyvale", "Palo Alto", "Cupertino", "Mountain View"],
+    "Stanislaus": ["Stanislaus", "Modesto", "Turlock", "Ceres"],
+}
+
+def _county_keywords(county_name: str) -> Tuple[str, ...]:
+    """County/city keywords to look for in a county's addresses."""
+    # Get city keywords for this county
+    county_keywords = [county_name]
+    if county_name in _COUNTY_TO_CITIES:
+        county_keywords.extend(_COUNTY_TO_CITIES[county_name])
+    else:
+        # For counties not in the map, use the county name and try to guess the city
+        # (Most county seats share the county name)
+        county_keywords.append(county_name.replace(" County", ""))
+    return tuple(county_keywords)
+
+_COUNTY_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    county_name: _county_keywords(county_name) for county_name in CALIFORNIA_COUNTIES
+}
+
+def _keyword_pattern(keywords: Tuple[str, ...]) -> re.Pattern:
+    """Single case-insensitive alternation matching any of the keywords, so one
+    scan checks them all without uppercasing each address first."""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+
+_COUNTY_KEYWORD_PATTERNS: Dict[str, re.Pattern] = {
+    county_name: _keyword_pattern(keywords) for county_name, keywords in _COUNTY_KEYWORDS.items()
+}
+
+# Fallback patterns for responses that aren't well-formed XML: marker tags,
+# and their attributes in either quote style
+_MARKER_RE = re.compile(r'<marker\s+([^>]+)/>')
+_ATTR_RE = re.compile(r'(\w+)=(?:"([^"]*)"|\'([^\']*)\')')
+
+def _marker_to_provider(attrs) -> Dict:
+    """Build a provider dict from a marker's attributes."""
+    return {
+        'name': attrs.get('name', ''),
+        'address': attrs.get('address', ''),
+        'phone': attrs.get('phone', ''),
+        'type': attrs.get('type', ''),
+        'lat': float(attrs.get('lat', 0)),
+        'lng': float(attrs.get('lng', 0)),
+        'distance': float(attrs.get('distance', 0))
     }
+
+def _parse_markers_lxml(data: bytes) -> List[Dict]:
+    """Parse markers with libxml2.
+    
+    Strict mode on purpose: recover mode silently rewrites malformed attribute
+    values (an unescaped '&' is dropped), so malformed responses must raise and
+    go to the regex fallback instead.
+    """
+    providers = []
+    for _, marker in _lxml_etree.iterparse(io.BytesIO(data), tag='marker'):
+        providers.append(_marker_to_provider(marker.attrib))
+        # Drop each marker (and any before it) once it's been converted
+        marker.clear()
+        while marker.getprevious() is not None:
+            del marker.getparent()[0]
+    return providers
+
+def _parse_markers_stdlib(data: bytes) -> List[Dict]:
+    """Parse markers with xml.etree, dropping each one once it's been converted."""
+    providers = []
+    context = ET.iterparse(io.BytesIO(data), events=('start', 'end'))
+    _, root = next(context)
+    for event, marker in context:
+        if event == 'end' and marker.tag == 'marker':
+            providers.append(_marker_to_provider(marker))
+            root.clear()
+    return providers
+
+def parse_providers_xml(content: bytes) -> List[Dict]:
+    """Parse provider markers out of a raw genxml.php response body."""
+    # Strip PHP warnings that appear before XML (common with this API)
+    # Find the XML start (<?xml)
+    xml_start = content.find(b'<?xml')
+    if xml_start > 0:
+        content = content[xml_start:]
     
+    # Try real XML parsing first (lxml when available, else the stdlib); both
+    # take the bytes as-is and honour the declared encoding
     try:
-        response = requests.get(BASE_URL, params=params, timeout=10)
-        response.raise_for_status()
-        
-        # Strip PHP warnings that appear before XML (common with this API)
-        content = response.text
-        # Find the XML start (<?xml)
-        xml_start = content.find('<?xml')
-        if xml_start > 0:
-            content = content[xml_start:]
-        
-        # Use BeautifulSoup which is more forgiving with malformed XML
-        # First, extract all marker tags using regex if XML is malformed
-        providers = []
+        if _lxml_etree is not None:
+            return _parse_markers_lxml(content)
+        return _parse_markers_stdlib(content)
+    except _XML_ERRORS:
+        pass
+    
+    # If XML parsing fails, use regex to extract marker data
+    providers = []
+    for match in _MARKER_RE.finditer(content.decode('utf-8', errors='replace')):
+        # Extract name="value" or name='value' attributes in one pass
+        attrs = {name: dq or sq for name, dq, sq in _ATTR_RE.findall(match.group(1))}
         
-        # Try standard XML parsing first
+        if attrs:
+            try:
+                providers.append(_marker_to_provider(attrs))
+            except (ValueError, KeyError):
+                continue
+    
+    return providers
+
+def _cache_path(lat: float, lng: float, radius: int) -> Path:
+    """Content-addressed cache file for a (lat, lng, radius) query."""
+    key = hashlib.blake2b(f"{lat}:{lng}:{radius}".encode(), digest_size=16).hexdigest()
+    return CACHE_DIR / f"{key}.xml.gz"
+
+def load_cached_xml(lat: float, lng: float, radius: int) -> Optional[bytes]:
+    """Return the cached response body for a query, or None if it isn't cached or has expired."""
+    path = _cache_path(lat, lng, radius)
+    try:
+        if time.time() - path.stat().st_mtime > CACHE_TTL:
+            return None
+        return gzip.decompress(path.read_bytes())
+    except (OSError, EOFError):
+        return None
+
+def save_cached_xml(lat: float, lng: float, radius: int, body: bytes):
+    """Cache a response body for a query, if the cache directory is writable."""
+    path = _cache_path(lat, lng, radius)
+    # Write to a temp file first so concurrent readers never see a partial entry
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        tmp_path.write_bytes(gzip.compress(body, compresslevel=1))
+        os.replace(tmp_path, path)
+    except OSError:
+        # The cache is only an optimisation; the caller still has the body
         try:
-            root = ET.fromstring(content.encode('utf-8', errors='replace'))
-            for marker in root.findall('marker'):
-                provider = {
-                    'name': marker.get('name', ''),
-                    'address': marker.get('address', ''),
-                    'phone': marker.get('phone', ''),
-                    'type': marker.get('type', ''),
-                    'lat': float(marker.get('lat', 0)),
-                    'lng': float(marker.get('lng', 0)),
-                    'distance': float(marker.get('distance', 0))
-                }
-                providers.append(provider)
-        except ET.ParseError:
-            # If XML parsing fails, use regex to extract marker data
-            # Pattern to match marker tags with all attributes
-            marker_pattern = r'<marker\s+([^>]+)/>'
-            matches = re.findall(marker_pattern, content)
-            
-            for match in matches:
-                # Extract attributes using regex
-                attrs = {}
-                # Match name="value" or name='value'
-                attr_pattern = r'(\w+)="([^"]*)"'
-                attr_matches = re.findall(attr_pattern, match)
-                for attr_name, attr_value in attr_matches:
-                    attrs[attr_name] = attr_value
-                
-                # Also try single quotes
-                if len(attrs) < 5:  # Not enough attributes found
-                    attr_pattern_sq = r"(\w+)='([^']*)'"
-                    attr_matches_sq = re.findall(attr_pattern_sq, match)
-                    for attr_name, attr_value in attr_matches_sq:
-                        attrs[attr_name] = attr_value
-                
-                if attrs:
-                    try:
-                        provider = {
-                            'name': attrs.get('name', ''),
-                            'address': attrs.get('address', ''),
-                            'phone': attrs.get('phone', ''),
-                            'type': attrs.get('type', ''),
-                            'lat': float(attrs.get('lat', 0)),
-                            'lng': float(attrs.get('lng', 0)),
-                            'distance': float(attrs.get('distance', 0))
-                        }
-                        providers.append(provider)
-                    except (ValueError, KeyError):
-                        continue
-        
-        return providers
+            tmp_path.unlink()
+        except OSError:
+            pass
+
+def _fetch_xml(lat: float, lng: float, radius: int) -> bytes:
+    """Fetch the raw response body for a query, from the cache when possible."""
+    body = load_cached_xml(lat, lng, radius)
+    if body is None:
+        params = {
+            'lat': lat,
+            'lng': lng,
+            'radius': radius
+        }
+        response = _SESSION.get(BASE_URL, params=params, timeout=10)
+        response.raise_for_status()
+        body = response.content
+        save_cached_xml(lat, lng, radius, body)
+    return body
+
+def clear_cache():
+    """Remove all cached API responses."""
+    for path in CACHE_DIR.glob("*.xml.gz"):
+        path.unlink()
+
+def fetch_providers(lat: float, lng: float, radius: int = 500) -> List[Dict]:
+    """Fetch providers for a given location and radius."""
+    try:
+        return parse_providers_xml(_fetch_xml(lat, lng, radius))
     except Exception as e:
         print(f"Error fetching providers: {e}", file=sys.stderr)
         return []
@@ -160,45 +310,34 @@ def filter_by_county(providers: List[Dict], county_name: str) -> List[Dict]:
     Since addresses usually contain city names (e.g., "Fresno, CA" not "Fresno County, CA"),
     we match against the county seat or major city names.
     """
-    # Map county names to their primary city names that appear in addresses
-    county_to_cities = {
-        "Alameda": ["Alameda", "Oakland", "Berkeley", "Fremont"],
-        "Contra Costa": ["Contra Costa", "Martinez", "Richmond", "Concord", "Pleasant Hill"],
-        "Fresno": ["Fresno", "Clovis", "Sanger"],
-        "Kern": ["Kern", "Bakersfield"],
-        "Los Angeles": ["Los Angeles", "LA", "L.A.", "Beverly Hills", "Long Beach", "Pasadena"],
-        "Orange": ["Orange", "Santa Ana", "Anaheim", "Irvine", "Huntington Beach"],
-        "Riverside": ["Riverside", "Palm Springs", "Moreno Valley", "Corona"],
-        "Sacramento": ["Sacramento", "Folsom", "Elk Grove"],
-        "San Bernardino": ["San Bernardino", "Fontana", "Rancho Cucamonga", "Ontario"],
-        "San Diego": ["San Diego", "Chula Vista", "Oceanside"],
-        "San Francisco": ["San Francisco", "SF"],
-        "San Joaquin": ["San Joaquin", "Stockton", "Lodi", "Tracy"],
-        "Santa Clara": ["Santa Clara", "San Jose", "Sunnyvale", "Palo Alto", "Cupertino", "Mountain View"],
-        "Stanislaus": ["Stanislaus", "Modesto", "Turlock", "Ceres"],
-    }
-    
-    # Get city keywords for this county
-    county_keywords = [county_name]
-    if county_name in county_to_cities:
-        county_keywords.extend(county_to_cities[county_name])
-    else:
-        # For counties not in the map, use the county name and try to guess the city
-        # (Most county seats share the county name)
-        county_keywords.append(county_name.replace(" County", ""))
+    keyword_pattern = (_COUNTY_KEYWORD_PATTERNS.get(county_name)
+                       or _keyword_pattern(_county_keywords(county_name)))
     
     filtered = []
     for provider in providers:
-        address = provider.get('address', '').upper()
         # Check if any county/city keyword appears in the address
-        if any(keyword.upper() in address for keyword in county_keywords):
+        if keyword_pattern.search(provider.get('address', '')):
             filtered.append(provider)
     
     return filtered
 
+def apply_county_filter(providers: List[Dict], county_name: str) -> List[Dict]:
+    """Optionally narrow providers to the county (but don't be too strict)."""
+    if len(providers) > 0:
+        filtered = filter_by_county(providers, county_name)
+        if len(filtered) >= len(providers) * 0.5:
+            print(f"  (Filtered to {len(filtered)} providers matching county keywords)")
+            return filtered
+        else:
+            # Return all if filtering removes too many
+            print(f"  (Keeping all {len(providers)} providers - geographic filtering is sufficient)")
+            return providers
+    
+    return providers
+
 def display_counties():
     """Display numbered list of counties."""
-    counties = sorted(CALIFORNIA_COUNTIES.keys())
+    counties = _SORTED_COUNTIES
     print("\nCalifornia Counties:")
     print("=" * 60)
     for i, county in enumerate(counties, 1):
@@ -207,7 +346,7 @@ def display_counties():
 
 def get_county_selection() -> Optional[str]:
     """Get county selection from user."""
-    counties = sorted(CALIFORNIA_COUNTIES.keys())
+    counties = _SORTED_COUNTIES
     
     while True:
         try:
@@ -226,7 +365,8 @@ def get_county_selection() -> Optional[str]:
                     continue
             
             # Try as name (partial match allowed)
-            matches = [c for c in counties if user_input.lower() in c.lower()]
+            query = user_input.lower()
+            matches = [c for c, c_lower in zip(counties, _COUNTY_LOWER_INDEX) if query in c_lower]
             if len(matches) == 1:
                 return matches[0]
             elif len(matches) > 1:
@@ -243,37 +383,61 @@ def get_county_selection() -> Optional[str]:
         except Exception as e:
             print(f"Error: {e}")
 
-def get_county_search_locations(county_name: str) -> List[tuple]:
+def follow_up_locations(search_locations: Tuple[Tuple[float, float], ...],
+                        center_count: int) -> Tuple[Tuple[float, float], ...]:
+    """Grid points still worth searching once the center returned center_count providers.
+    
+    The grid only exists to page around the API's result limit: well below it the
+    center already has everything in range, and just below it the four cardinal
+    points are enough. An empty center (possibly a failed request) gets the full grid.
+    """
+    if 0 < center_count < SPARSE_RESULT_THRESHOLD:
+        return ()
+    if 0 < center_count < API_RESULT_LIMIT:
+        return search_locations[1:5]  # North, South, East, West
+    return search_locations[1:]
+
+@functools.lru_cache(maxsize=None)
+def get_county_search_locations(county_name: str,
+                                radius: Optional[int] = None) -> Tuple[Tuple[float, float], ...]:
     """Get multiple search locations for a county to ensure complete coverage.
     
     The API limits results to ~50 providers per request, so we search multiple
-    locations within each county to get all providers.
+    locations within each county to get all providers. For radii too small to
+    reach the neighbouring grid points, the grid is pulled in so the search
+    circles still overlap instead of leaving gaps between them.
+    
+    The result is memoized and returned as an immutable tuple.
     """
     if county_name not in CALIFORNIA_COUNTIES:
-        return []
+        return ()
     
     base_lat, base_lng = CALIFORNIA_COUNTIES[county_name]
     
+    step = GRID_STEP_DEGREES
+    if radius is not None:
+        step = min(step, radius * 0.6 / MILES_PER_DEGREE)
+    
     # Create a grid of locations around the base location
     # This ensures we capture all providers even if they're spread out
     locations = [(base_lat, base_lng)]  # Center
     
     # Add points in a grid pattern
     offsets = [
-        (0.05, 0),      # North
-        (-0.05, 0),    # South
-        (0, 0.05),     # East
-        (0, -0.05),    # West
-        (0.05, 0.05),  # Northeast
-        (0.05, -0.05), # Northwest
-        (-0.05, 0.05), # Southeast
-        (-0.05, -0.05), # Southwest
+        (1, 0),     # North
+        (-1, 0),    # South
+        (0, 1),     # East
+        (0, -1),    # West
+        (1, 1),     # Northeast
+        (1, -1),    # Northwest
+        (-1, 1),    # Southeast
+        (-1, -1),   # Southwest
     ]
     
     for lat_offset, lng_offset in offsets:
-        locations.append((base_lat + lat_offset, base_lng + lng_offset))
+        locations.append((base_lat + lat_offset * step, base_lng + lng_offset * step))
     
-    return locations
+    return tuple(locations)
 
 def extract_county_providers(county_name: str, radius: int = 100) -> List[Dict]:
     """Extract providers for a specific county by searching multiple locations.
@@ -294,31 +458,47 @@ def extract_county_providers(county_name: str, radius: int = 100) -> List[Dict]:
     print("(The API limits results, so we search multiple points)\n")
     
     # Get multiple search locations
-    search_locations = get_county_search_locations(county_name)
+    search_locations = get_county_search_locations(county_name, radius)
     
     # Collect all unique providers
     all_providers = {}
     total_fetched = 0
     
-    for i, (lat, lng) in enumerate(search_locations, 1):
-        print(f"  Location {i}/{len(search_locations)}: {lat:.4f}, {lng:.4f}...", end=' ', flush=True)
-        providers = fetch_providers(lat, lng, radius=radius)
+    def merge(i: int, total: int, lat: float, lng: float, providers: List[Dict]):
+        nonlocal total_fetched
+        print(f"  Location {i}/{total}: {lat:.4f}, {lng:.4f}...", end=' ', flush=True)
         total_fetched += len(providers)
         
         # Use name+address as unique key to avoid duplicates
         new_count = 0
         for provider in providers:
-            key = f"{provider['name']}|{provider['address']}"
-            if key not in all_providers:
-                all_providers[key] = provider
+            key = (provider['name'], provider['address'])
+            if all_providers.setdefault(key, provider) is provider:
                 new_count += 1
         
         print(f"Found {len(providers)} (new: {new_count}, total unique: {len(all_providers)})")
-        
-        # If we got fewer than 50, we've likely reached the edges
-        # Continue searching other locations but note this
-        if len(providers) < 30:
-            pass  # Still continue to other locations
+    
+    # Search the center first; its result count decides how much of the
+    # grid is still needed
+    center_lat, center_lng = search_locations[0]
+    center_providers = fetch_providers(center_lat, center_lng, radius=radius)
+    remaining = follow_up_locations(search_locations, len(center_providers))
+    total = 1 + len(remaining)
+    merge(1, total, center_lat, center_lng, center_providers)
+    
+    if not remaining:
+        print("  (Center is well below the API limit; skipping the rest of the grid)")
+    elif len(remaining) < len(search_locations) - 1:
+        print(f"  (Center is just below the API limit; searching {len(remaining)} more locations)")
+    
+    # Fetch the rest at once, then merge in location order so the
+    # output doesn't depend on which request finishes first
+    if remaining:
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+            futures = [executor.submit(fetch_providers, lat, lng, radius) for lat, lng in remaining]
+            
+            for i, ((lat, lng), future) in enumerate(zip(remaining, futures), 2):
+                merge(i, total, lat, lng, future.result())
     
     providers_list = list(all_providers.values())
     
@@ -328,25 +508,18 @@ def extract_county_providers(county_name: str, radius: int = 100) -> List[Dict]:
     
     print(f"\n✓ Found {len(providers_list)} unique providers from {total_fetched} total results")
     
-    # Optional filtering by county name (but don't be too strict)
-    if len(providers_list) > 0:
-        filtered = filter_by_county(providers_list, county_name)
-        if len(filtered) >= len(providers_list) * 0.5:
-            print(f"  (Filtered to {len(filtered)} providers matching county keywords)")
-            return filtered
-        else:
-            # Return all if filtering removes too many
-            print(f"  (Keeping all {len(providers_list)} providers - geographic filtering is sufficient)")
-            return providers_list
-    
-    return providers_list
+    return apply_county_filter(providers_list, county_name)
 
 def save_results(providers: List[Dict], county_name: str):
-    """Save results to JSON file."""
+    """Save results to a compact JSON file."""
     filename = f"vfc_providers_{county_name.replace(' ', '_').lower()}.json"
     
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(providers, f, indent=2, ensure_ascii=False)
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(providers, option=orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(providers, f, ensure_ascii=False, separators=(',', ':'))
     
     print(f"\n✓ Saved {len(providers)} providers to {filename}")
     return filename
@@ -360,13 +533,10 @@ def print_summary(providers: List[Dict], county_name: str):
     
     if providers:
         # Group by type
-        types = {}
-        for provider in providers:
-            ptype = provider.get('type', 'Unknown')
-            types[ptype] = types.get(ptype, 0) + 1
+        type_counts = Counter(p.get('type', 'Unknown') for p in providers)
         
         print(f"\nProviders by type:")
-        for ptype, count in sorted(types.items()):
+        for ptype, count in sorted(type_counts.items()):
             print(f"  {ptype}: {count}")
         
         print(f"\nFirst 5 providers:")
@@ -381,6 +551,63 @@ def print_summary(providers: List[Dict], county_name: str):
 
 def main():
     """Main CLI loop."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Extract VFC providers by California county')
+    
+    parser.add_argument(
+        '--clear-cache',
+        action='store_true',
+        help='Discard cached API responses before starting'
+    )
+    
+    parser.add_argument(
+        '--all',
+        action='store_true',
+        help='Extract every county concurrently instead of prompting for one'
+    )
+    
+    parser.add_argument(
+        '--counties',
+        type=str,
+        help='Comma-separated counties to extract concurrently (e.g. "Fresno,Kern")'
+    )
+    
+    parser.add_argument(
+        '--radius',
+        type=int,
+        default=200,
+        help='Search radius in miles for --all/--counties (default: 200)'
+    )
+    
+    parser.add_argument(
+        '--output',
+        type=str,
+        default='JSON_Counties',
+        help='Output folder for --all/--counties (default: JSON_Counties)'
+    )
+    
+    args = parser.parse_args()
+    
+    counties = None
+    if args.counties:
+        counties_by_lower = {c.lower(): c for c in CALIFORNIA_COUNTIES}
+        requested = [name.strip() for name in args.counties.split(',') if name.strip()]
+        unknown = [name for name in requested if name.lower() not in counties_by_lower]
+        if unknown:
+            parser.error(f"unknown county: {', '.join(unknown)}")
+        counties = [counties_by_lower[name.lower()] for name in requested]
+    
+    if args.clear_cache:
+        clear_cache()
+        print("✓ Cleared cached API responses")
+    
+    # Batch mode: hand off to the async extractor
+    if args.all or counties:
+        from batch_extract_all_counties import extract_all_counties
+        extract_all_counties(radius=args.radius, output_folder=args.output, counties=counties)
+        return
+    
     print("=" * 60)
     print("VFC Provider Extractor by County")
     print("=" * 60)